@@ -1,5 +1,21 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, nullcontext
+from itertools import islice
+from math import sqrt
+from statistics import NormalDist
+
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+# Noyau compilé optionnel : sans Numba, on se rabat sur la version NumPy
+# répartie sur plusieurs processus
+try:
+    from vpp_kernel import count_successful_years_nb
+except ImportError:
+    count_successful_years_nb = None
 
 # =====================================================
 # PARAMÈTRES GLOBAUX DU MODÈLE
@@ -29,92 +45,151 @@ TARGET_NET_BALANCE = 0.0005         # Balance nette positive cible par slot
 # L'équation garantit que : recharge × (1-p) - décharge × p = balance positive
 SOC_RECHARGE_RATE = (SOC_DEGRADATION_PER_USE * P_AVAILABLE_FCR + TARGET_NET_BALANCE) / (1 - P_AVAILABLE_FCR)
 
+# Variations de SOC par slot (kWh), précalculées une fois pour toutes
+_DISCHARGE_DELTA = -SOC_DEGRADATION_PER_USE * SOC_MEAN
+_RECHARGE_DELTA = SOC_RECHARGE_RATE * SOC_MEAN
+
 # Critère de succès annuel
 MIN_SUCCESS_RATE = 0.95       # L'agrégateur doit fournir 10 MW pendant au moins 95% des slots
 
+# Enregistrement par slot de simulate_year_with_tracking
+HISTORY_DTYPE = np.dtype([
+    ('fcr_power', 'f8'),      # Puissance FCR fournie (kW)
+    ('success', '?'),         # Objectif de puissance atteint
+    ('available', 'i4'),      # Nombre d'actifs disponibles
+    ('soc_ok', 'i4'),         # Nombre d'actifs avec SOC suffisant
+])
+
+# Type des tableaux d'état (SOC, puissances) : la précision simple suffit
+# largement pour des grandeurs de l'ordre de 10² à 10³ kW / kWh
+STATE_DTYPE = np.float32
+
+# Taille maximale d'un bloc de tirages pré-générés (octets par tableau)
+POOL_MAX_BYTES = 32 * 1024**2
+
+# Nombre d'essais par tâche confiée au pool de processus (version NumPy) :
+# fixe, pour que le découpage et donc les flux aléatoires ne dépendent pas
+# du nombre de cœurs
+TRIALS_PER_TASK = 25
+
 
 # =====================================================
-# MISE À JOUR DU SOC
+# SIMULATION D'UN SLOT DE MARCHÉ
 # =====================================================
-def update_soc(socs, powers, available_for_fcr):
+def normal_state(rng, mean, std, size):
+    """
+    Tire un tableau gaussien de type STATE_DTYPE.
+    
+    Generator.normal ne propose pas de paramètre dtype : on passe par
+    standard_normal, puis on met à l'échelle en place.
+    """
+    values = rng.standard_normal(size, dtype=STATE_DTYPE)
+    values *= std
+    values += mean
+    return values
+
+
+def make_slot_scratch(n_assets):
+    """
+    Alloue les tableaux de travail réutilisés d'un slot à l'autre par simulate_slot_and_update.
+    
+    Returns:
+        Dictionnaire de tableaux de taille n_assets
+    """
+    return {
+        'powers': np.empty(n_assets, dtype=STATE_DTYPE),
+        'available_rand': np.empty(n_assets, dtype=STATE_DTYPE),
+        'energy_need': np.empty(n_assets, dtype=STATE_DTYPE),
+        'available_for_fcr': np.empty(n_assets, dtype=bool),
+        'has_enough_soc': np.empty(n_assets, dtype=bool),
+        'can_provide_fcr': np.empty(n_assets, dtype=bool),
+    }
+
+
+def apply_soc_update(socs, can_provide_fcr):
     """
-    Met à jour l'état de charge des batteries selon leur utilisation.
+    Met à jour en place l'état de charge des batteries selon leur utilisation.
     
     Les actifs utilisés pour FCR se déchargent légèrement, tandis que ceux
     réservés sur d'autres marchés (aFRR, arbitrage) se rechargent.
     Le taux de recharge est calibré automatiquement pour maintenir un équilibre
     positif sur le long terme en fonction de P_AVAILABLE_FCR.
     
-    Args:
-        socs: États de charge actuels (kWh)
-        powers: Puissances nominales des actifs (kW)
-        available_for_fcr: Masque booléen indiquant quels actifs sont utilisés pour FCR
-        
-    Returns:
-        États de charge mis à jour, avec limite basse à 0
+    Recharge appliquée à tous, puis correction vers la décharge sur le masque
+    (ufunc avec where=) : aucun tableau temporaire, quelle que soit la forme
+    de socs (un portefeuille ou un lot d'essais).
     """
-    delta_soc = np.zeros_like(socs)
-    
-    # Décharge pour les actifs sollicités sur le marché FCR
-    delta_soc[available_for_fcr] = -SOC_DEGRADATION_PER_USE * SOC_MEAN
-    
-    # Recharge pour les actifs utilisés sur d'autres marchés
-    delta_soc[~available_for_fcr] = SOC_RECHARGE_RATE * SOC_MEAN
-    
-    # Application des variations avec contrainte de non-négativité
-    socs = socs + delta_soc
-    return np.clip(socs, 0, None)
+    socs += _RECHARGE_DELTA
+    np.add(socs, _DISCHARGE_DELTA - _RECHARGE_DELTA, out=socs, where=can_provide_fcr)
+    np.maximum(socs, 0, out=socs)  # Contrainte de non-négativité
 
 
-# =====================================================
-# SIMULATION D'UN SLOT DE MARCHÉ
-# =====================================================
-def simulate_fcr_slot(socs):
+def simulate_slot_and_update(socs, rng, scratch=None):
     """
-    Simule un slot de 4 heures sur le marché FCR.
+    Simule un slot de 4 heures sur le marché FCR puis met à jour le SOC.
     
     À chaque slot, chaque actif a une probabilité P_AVAILABLE_FCR d'être disponible
     pour le marché FCR. Pour contribuer effectivement, un actif doit :
     1. Être disponible (tirage aléatoire selon P_AVAILABLE_FCR)
     2. Avoir suffisamment de SOC pour tenir pendant toute la durée du slot
     
+    Le tirage, les contraintes, l'agrégation de puissance et la mise à jour du
+    SOC (apply_soc_update) sont enchaînés en place dans scratch et socs, sans
+    renvoyer de tableaux intermédiaires.
+    
     Args:
-        socs: États de charge actuels de tous les actifs (kWh)
+        socs: États de charge de tous les actifs (kWh), modifiés en place
+        rng: Générateur aléatoire (np.random.Generator)
+        scratch: Tableaux de travail issus de make_slot_scratch (alloués si None)
         
     Returns:
         success: Booléen indiquant si l'objectif de puissance est atteint
-        can_provide_fcr: Masque des actifs pouvant effectivement fournir FCR
-        available_for_fcr: Masque des actifs disponibles (avant contrainte SOC)
-        powers: Puissances nominales tirées pour ce slot
+        available_fcr_power: Puissance FCR effectivement fournie (kW)
+        available_count: Nombre d'actifs disponibles (avant contrainte SOC)
+        has_enough_soc_count: Nombre d'actifs dont le SOC permettait de tenir le slot
     """
-    n_assets = len(socs)
+    if scratch is None:
+        scratch = make_slot_scratch(len(socs))
+    powers = scratch['powers']
+    available_for_fcr = scratch['available_for_fcr']
+    has_enough_soc = scratch['has_enough_soc']
+    can_provide_fcr = scratch['can_provide_fcr']
 
     # Tirage des puissances nominales avec variabilité
-    powers = np.random.normal(POWER_MEAN, POWER_STD, n_assets)
-    powers = np.clip(powers, 20, None)  # Limite basse technique
+    rng.standard_normal(out=powers, dtype=STATE_DTYPE)
+    powers *= POWER_STD
+    powers += POWER_MEAN
+    np.maximum(powers, 20, out=powers)  # Limite basse technique
 
     # Disponibilité aléatoire : chaque actif peut être réservé sur un autre marché
-    available_for_fcr = np.random.random(n_assets) < P_AVAILABLE_FCR
+    rng.random(out=scratch['available_rand'], dtype=STATE_DTYPE)
+    np.less(scratch['available_rand'], P_AVAILABLE_FCR, out=available_for_fcr)
     
     # Contrainte énergétique : vérification que le SOC permet de tenir 4 heures
-    has_enough_soc = socs >= powers * ENERGY_HOURS
+    np.multiply(powers, ENERGY_HOURS, out=scratch['energy_need'])
+    np.greater_equal(socs, scratch['energy_need'], out=has_enough_soc)
     
     # Un actif contribue au FCR ssi disponible ET capacité énergétique suffisante
-    can_provide_fcr = available_for_fcr & has_enough_soc
+    np.logical_and(available_for_fcr, has_enough_soc, out=can_provide_fcr)
     
-    # Agrégation de la puissance disponible
-    available_fcr_power = np.sum(powers[can_provide_fcr])
+    # Agrégation de la puissance disponible, accumulée en float64 pour ne pas
+    # dépendre de la précision réduite des états
+    available_fcr_power = float(np.einsum('i,i->', powers, can_provide_fcr, dtype=np.float64))
     
     # Vérification de l'objectif de puissance
     success = available_fcr_power >= REQUIRED_POWER
     
-    return success, can_provide_fcr, available_for_fcr, powers
+    # Mise à jour du SOC pour le prochain slot
+    apply_soc_update(socs, can_provide_fcr)
+    
+    return (success, available_fcr_power,
+            np.count_nonzero(available_for_fcr), np.count_nonzero(has_enough_soc))
 
 
 # =====================================================
 # SIMULATION D'UNE ANNÉE COMPLÈTE
 # =====================================================
-def simulate_year_with_tracking(n_assets):
+def simulate_year_with_tracking(n_assets, seed=None):
     """
     Simule une année complète (2190 slots) avec suivi détaillé des métriques.
     
@@ -123,80 +198,206 @@ def simulate_year_with_tracking(n_assets):
     
     Args:
         n_assets: Nombre d'actifs dans le portefeuille
+        seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
         
     Returns:
         Dictionnaire contenant les historiques et statistiques de la simulation
     """
+    rng = np.random.default_rng(seed)
+    
     # Initialisation des SOC selon une distribution normale
-    socs = np.clip(
-        np.random.normal(SOC_MEAN, SOC_STD, n_assets),
-        0, None
-    )
+    socs = normal_state(rng, SOC_MEAN, SOC_STD, n_assets)
+    np.maximum(socs, 0, out=socs)
     
     success_count = 0
     
-    # Structures de stockage des historiques
-    soc_history = [socs.copy()]
-    fcr_power_history = []
-    success_history = []
-    available_history = []
-    soc_ok_history = []
+    # Structures de stockage des historiques, allouées une seule fois
+    soc_history = np.empty((N_SLOTS_YEAR + 1, n_assets), dtype=STATE_DTYPE)
+    history = np.empty(N_SLOTS_YEAR, dtype=HISTORY_DTYPE)
+    soc_history[0] = socs
+    scratch = make_slot_scratch(n_assets)
 
     # Simulation de tous les slots de l'année
-    for _ in range(N_SLOTS_YEAR):
-        success, can_provide, available, powers = simulate_fcr_slot(socs)
+    for t in range(N_SLOTS_YEAR):
+        success, fcr_power, available_count, soc_ok_count = simulate_slot_and_update(socs, rng, scratch)
         
         if success:
             success_count += 1
         
-        # Mise à jour du SOC pour le prochain slot
-        socs = update_soc(socs, powers, can_provide)
-        
         # Enregistrement des métriques
-        soc_history.append(socs.copy())
-        fcr_power_history.append(np.sum(powers[can_provide]))
-        success_history.append(success)
-        available_history.append(np.sum(available))
-        soc_ok_history.append(np.sum(socs >= powers * ENERGY_HOURS))
+        soc_history[t + 1] = socs
+        history[t] = (fcr_power, success, available_count, soc_ok_count)
 
     return {
-        'soc_history': np.array(soc_history),
-        'fcr_power_history': np.array(fcr_power_history),
-        'success_history': np.array(success_history),
-        'available_history': np.array(available_history),
-        'soc_ok_history': np.array(soc_ok_history),
+        'soc_history': soc_history,
+        'history': history,
+        # Vues sur les champs de history (aucune copie)
+        'fcr_power_history': history['fcr_power'],
+        'success_history': history['success'],
+        'available_history': history['available'],
+        'soc_ok_history': history['soc_ok'],
         'success_rate': success_count / N_SLOTS_YEAR
     }
 
 
-def simulate_year(n_assets):
+def make_batch_scratch(n_trials, n_assets):
     """
-    Version simplifiée de la simulation annuelle pour les calculs de probabilité.
+    Alloue les tableaux de travail réutilisés d'un slot à l'autre par simulate_years_batch.
     
-    Ne stocke pas l'historique complet, uniquement le résultat final (succès/échec).
+    Returns:
+        Dictionnaire de tableaux (n_trials, n_assets) et (n_trials,)
     """
-    socs = np.clip(
-        np.random.normal(SOC_MEAN, SOC_STD, n_assets),
-        0, None
-    )
-    
-    success_count = 0
+    shape = (n_trials, n_assets)
+    return {
+        'has_enough_soc': np.empty(shape, dtype=bool),
+        'can_provide_fcr': np.empty(shape, dtype=bool),
+        'power_sum': np.empty(n_trials, dtype=np.float64),
+        'slot_success': np.empty(n_trials, dtype=bool),
+    }
 
-    for _ in range(N_SLOTS_YEAR):
-        success, can_provide, available, powers = simulate_fcr_slot(socs)
-        
-        if success:
-            success_count += 1
+
+def simulate_years_batch(n_assets, n_trials, seed=None, scratch=None):
+    """
+    Simule n_trials années indépendantes en parallèle (vectorisation NumPy).
+    
+    Les SOC sont stockés dans un tableau (n_trials, n_assets) : chaque ligne
+    correspond à une année simulée. La boucle Python ne porte que sur les
+    slots, tous les tirages et réductions étant effectués d'un seul coup pour
+    l'ensemble des essais.
+    
+    Les puissances et disponibilités ne dépendent pas du SOC : elles sont
+    tirées à l'avance par blocs de slots (au plus POOL_MAX_BYTES par tableau)
+    plutôt qu'à chaque slot. Dans la boucle sur les slots, tous les calculs
+    sont faits en place dans scratch.
+    
+    Args:
+        n_assets: Nombre d'actifs dans le portefeuille
+        n_trials: Nombre d'années simulées simultanément
+        seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
+        scratch: Tableaux de travail issus de make_batch_scratch (alloués si None)
         
-        socs = update_soc(socs, powers, can_provide)
+    Returns:
+        Tableau booléen de longueur n_trials (succès/échec de chaque année)
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n_trials, n_assets)
+    socs = normal_state(rng, SOC_MEAN, SOC_STD, shape)
+    np.maximum(socs, 0, out=socs)
+    
+    if scratch is None:
+        scratch = make_batch_scratch(n_trials, n_assets)
+    has_enough_soc = scratch['has_enough_soc']
+    can = scratch['can_provide_fcr']
+    power_sum = scratch['power_sum']
+    slot_success = scratch['slot_success']
+    
+    success_count = np.zeros(n_trials, dtype=np.int32)
+    itemsize = np.dtype(STATE_DTYPE).itemsize
+    block = max(1, POOL_MAX_BYTES // max(1, itemsize * n_trials * n_assets))
+
+    for start in range(0, N_SLOTS_YEAR, block):
+        n_block = min(block, N_SLOTS_YEAR - start)
+        powers_all = normal_state(rng, POWER_MEAN, POWER_STD, (n_block, n_trials, n_assets))
+        np.maximum(powers_all, 20, out=powers_all)
+        avail_all = rng.random((n_block, n_trials, n_assets), dtype=STATE_DTYPE) < P_AVAILABLE_FCR
+        # Énergie nécessaire pour tenir le slot, calculée en une passe pour tout le bloc
+        energy_all = powers_all * ENERGY_HOURS
+
+        for t in range(n_block):
+            np.greater_equal(socs, energy_all[t], out=has_enough_soc)
+            np.logical_and(avail_all[t], has_enough_soc, out=can)
+            
+            np.einsum('ij,ij->i', powers_all[t], can, out=power_sum, dtype=np.float64)
+            np.greater_equal(power_sum, REQUIRED_POWER, out=slot_success)
+            success_count += slot_success
+            
+            apply_soc_update(socs, can)
 
     return success_count / N_SLOTS_YEAR >= MIN_SUCCESS_RATE
 
 
+def simulate_year(n_assets, seed=None, scratch=None):
+    """
+    Version simplifiée de la simulation annuelle pour les calculs de probabilité.
+    
+    Ne stocke pas l'historique complet, uniquement le résultat final (succès/échec).
+    scratch, s'il est fourni, provient de make_batch_scratch(1, n_assets).
+    """
+    return bool(simulate_years_batch(n_assets, 1, seed, scratch)[0])
+
+
 # =====================================================
 # CALCUL DE LA PROBABILITÉ DE SUCCÈS ANNUELLE
 # =====================================================
-def annual_success_probability(n_assets, n_trials=200):
+def trial_executor():
+    """
+    Crée le pool de processus partagé par toutes les estimations d'une recherche.
+    
+    À utiliser comme gestionnaire de contexte (with trial_executor() as executor).
+    Avec Numba (déjà multithreadé) ou sur un seul cœur, aucun pool n'est créé
+    et executor vaut None.
+    """
+    if count_successful_years_nb is not None or (os.cpu_count() or 1) == 1:
+        return nullcontext()
+    return ProcessPoolExecutor()
+
+
+def _trial_worker(args):
+    """
+    Simule un paquet d'essais, éventuellement dans un processus du pool.
+    
+    Définie au niveau du module pour pouvoir être transmise (picklée) aux
+    processus de ProcessPoolExecutor.
+    
+    Args:
+        args: Tuple (n_assets, n_trials, rng)
+        
+    Returns:
+        Nombre d'années réussies dans le paquet
+    """
+    n_assets, n_trials, rng = args
+    if count_successful_years_nb is None:
+        return int(np.count_nonzero(simulate_years_batch(n_assets, n_trials, rng)))
+    
+    # Le noyau Numba garde son propre générateur : on ne lui transmet qu'une graine
+    base_seed = int(rng.integers(0, 2**31 - n_trials))
+    return int(count_successful_years_nb(
+        n_assets, n_trials, SOC_MEAN, SOC_STD, POWER_MEAN, POWER_STD,
+        P_AVAILABLE_FCR, _DISCHARGE_DELTA, _RECHARGE_DELTA,
+        ENERGY_HOURS, REQUIRED_POWER, N_SLOTS_YEAR, MIN_SUCCESS_RATE,
+        base_seed
+    ))
+
+
+def count_successful_years(n_assets, n_trials, seed=None, executor=None):
+    """
+    Compte, parmi n_trials années simulées, celles qui atteignent MIN_SUCCESS_RATE.
+    
+    Utilise le noyau Numba s'il est disponible. Sinon, les essais sont découpés
+    en paquets de TRIALS_PER_TASK, chacun avec son propre flux aléatoire :
+    le résultat pour une graine donnée ne dépend pas du nombre de cœurs.
+    
+    Args:
+        n_assets: Taille du portefeuille à évaluer
+        n_trials: Nombre de simulations indépendantes
+        seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
+        executor: Pool issu de trial_executor (None pour un calcul sur place)
+        
+    Returns:
+        Nombre d'années réussies
+    """
+    rng = np.random.default_rng(seed)
+    if count_successful_years_nb is not None:
+        return _trial_worker((n_assets, n_trials, rng))
+    
+    sizes = [min(TRIALS_PER_TASK, n_trials - start)
+             for start in range(0, n_trials, TRIALS_PER_TASK)]
+    tasks = [(n_assets, size, child) for size, child in zip(sizes, rng.spawn(len(sizes)))]
+    mapper = map if executor is None else executor.map
+    return sum(mapper(_trial_worker, tasks))
+
+
+def annual_success_probability(n_assets, n_trials=200, seed=None, executor=None):
     """
     Estime la probabilité qu'un portefeuille de n_assets respecte le critère
     de disponibilité annuelle via simulation Monte Carlo.
@@ -204,15 +405,112 @@ def annual_success_probability(n_assets, n_trials=200):
     Args:
         n_assets: Taille du portefeuille à évaluer
         n_trials: Nombre de simulations indépendantes pour l'estimation
+        seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
+        executor: Pool issu de trial_executor (None pour un calcul sur place)
         
     Returns:
         Proportion de simulations ayant atteint MIN_SUCCESS_RATE
     """
+    return count_successful_years(n_assets, n_trials, seed, executor) / n_trials
+
+
+def wilson_ci(successes, n_trials, alpha=0.05):
+    """
+    Intervalle de confiance de Wilson (niveau 1 - alpha) pour une proportion.
+    
+    Contrairement à l'intervalle normal, il reste valable près de 0 et de 1,
+    ce qui est le cas des probabilités estimées loin du seuil de dimensionnement.
+    
+    Returns:
+        Tuple (borne basse, borne haute)
+    """
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    p = successes / n_trials
+    denom = 1 + z**2 / n_trials
+    center = (p + z**2 / (2 * n_trials)) / denom
+    half_width = z * sqrt(p * (1 - p) / n_trials + z**2 / (4 * n_trials**2)) / denom
+    return center - half_width, center + half_width
+
+
+def _ordered_results(executor, tasks):
+    """
+    Rend, dans l'ordre des tâches, les résultats de _trial_worker calculés par executor.
+    
+    Une seule tâche par processus est en attente : la suivante n'est soumise
+    qu'à la lecture d'un résultat. Fermer le générateur (arrêt anticipé)
+    annule celles qui n'ont pas démarré, sans occuper le pool avec des lots
+    dont le résultat ne servira pas.
+    """
+    tasks = iter(tasks)
+    pending = deque(executor.submit(_trial_worker, task)
+                    for task in islice(tasks, executor._max_workers))
+    try:
+        while pending:
+            count = pending.popleft().result()
+            for task in islice(tasks, 1):
+                pending.append(executor.submit(_trial_worker, task))
+            yield count
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def annual_success_probability_adaptive(
+    n_assets,
+    target,
+    max_trials=100,
+    batch_size=10,
+    alpha=0.05,
+    seed=None,
+    executor=None
+):
+    """
+    Estime la probabilité de succès annuelle avec un nombre d'essais adaptatif.
+    
+    Les essais sont lancés par lots de batch_size ; on s'arrête dès que
+    l'intervalle de Wilson exclut target. Les portefeuilles nettement au-dessus
+    ou en dessous du seuil sont ainsi tranchés bien avant max_trials.
+    
+    Chaque lot a son propre flux aléatoire. Avec un pool, environ un lot par
+    processus est en cours et les résultats sont lus dans l'ordre (voir
+    _ordered_results). Le résultat ne dépend donc pas de executor.
+    
+    Args:
+        n_assets: Taille du portefeuille à évaluer
+        target: Probabilité cible à comparer
+        max_trials: Nombre maximal de simulations
+        batch_size: Nombre de simulations entre deux tests d'arrêt
+        alpha: Risque de l'intervalle de confiance
+        seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
+        executor: Pool issu de trial_executor (None pour un calcul sur place)
+        
+    Returns:
+        Tuple (probabilité estimée, nombre d'essais réalisés, cible atteinte)
+    """
+    rng = np.random.default_rng(seed)
+    sizes = [min(batch_size, max_trials - start) for start in range(0, max_trials, batch_size)]
+    tasks = [(n_assets, size, child) for size, child in zip(sizes, rng.spawn(len(sizes)))]
+    
+    if executor is None:
+        counts = (_trial_worker(task) for task in tasks)
+    else:
+        counts = _ordered_results(executor, tasks)
+    
     successes = 0
-    for _ in range(n_trials):
-        if simulate_year(n_assets):
-            successes += 1
-    return successes / n_trials
+    n_done = 0
+    with closing(counts):
+        for n_batch, count in zip(sizes, counts):
+            successes += count
+            n_done += n_batch
+            
+            lo, hi = wilson_ci(successes, n_done, alpha)
+            if hi < target:
+                return successes / n_done, n_done, False
+            if lo > target:
+                return successes / n_done, n_done, True
+    
+    # Budget épuisé sans conclusion : on se fie à l'estimation ponctuelle
+    return successes / n_done, n_done, successes / n_done >= target
 
 
 def installed_capacity(n_assets):
@@ -238,8 +536,13 @@ def plot_soc_evolution(result, n_assets_sample=10):
     soc_history = result['soc_history']
     n_show = min(n_assets_sample, soc_history.shape[1])
     
-    for i in range(n_show):
-        ax.plot(soc_history[:, i], alpha=0.6, linewidth=1, label=f'Actif {i+1}')
+    # Une seule collection plutôt qu'un appel à ax.plot par actif
+    slots = np.arange(soc_history.shape[0])
+    segments = [np.column_stack([slots, soc_history[:, i]]) for i in range(n_show)]
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    ax.add_collection(LineCollection(segments, colors=colors, alpha=0.6, linewidths=1,
+                                     label=f'Actifs 1 à {n_show}'))
+    ax.autoscale_view()
     
     ax.axhline(y=0, color='red', linestyle='--', linewidth=2, 
                label='Limite critique : batterie vide')
@@ -407,7 +710,7 @@ def plot_oversizing_vs_probability():
 # DIAGNOSTIC ET ANALYSE
 # =====================================================
 
-def diagnostic_slot(n_assets=200):
+def diagnostic_slot(n_assets=200, seed=None):
     """
     Analyse détaillée d'un seul slot pour validation du modèle.
     
@@ -417,13 +720,13 @@ def diagnostic_slot(n_assets=200):
     print("DIAGNOSTIC D'UN SLOT")
     print(f"{'='*70}\n")
     
-    socs = np.clip(
-        np.random.normal(SOC_MEAN, SOC_STD, n_assets),
-        0, None
-    )
+    rng = np.random.default_rng(seed)
     
-    powers = np.random.normal(POWER_MEAN, POWER_STD, n_assets)
-    powers = np.clip(powers, 20, None)
+    socs = rng.normal(SOC_MEAN, SOC_STD, n_assets)
+    np.maximum(socs, 0, out=socs)
+    
+    powers = rng.normal(POWER_MEAN, POWER_STD, n_assets)
+    np.maximum(powers, 20, out=powers)
     
     print(f"État initial :")
     print(f"  Nombre d'actifs : {n_assets}")
@@ -431,28 +734,28 @@ def diagnostic_slot(n_assets=200):
     print(f"  Puissance moyenne : {np.mean(powers):.1f} kW")
     print(f"  Énergie requise par actif : {np.mean(powers) * ENERGY_HOURS:.1f} kWh")
     
-    available_for_fcr = np.random.random(n_assets) < P_AVAILABLE_FCR
+    available_for_fcr = rng.random(n_assets) < P_AVAILABLE_FCR
     has_enough_soc = socs >= powers * ENERGY_HOURS
     can_provide_fcr = available_for_fcr & has_enough_soc
     
     print(f"\nContraintes :")
-    print(f"  Actifs disponibles (p={P_AVAILABLE_FCR}) : {np.sum(available_for_fcr)} / {n_assets} ({np.sum(available_for_fcr)/n_assets*100:.1f}%)")
-    print(f"  Actifs avec SOC suffisant : {np.sum(has_enough_soc)} / {n_assets} ({np.sum(has_enough_soc)/n_assets*100:.1f}%)")
-    print(f"  Actifs pouvant fournir FCR : {np.sum(can_provide_fcr)} / {n_assets} ({np.sum(can_provide_fcr)/n_assets*100:.1f}%)")
+    print(f"  Actifs disponibles (p={P_AVAILABLE_FCR}) : {np.count_nonzero(available_for_fcr)} / {n_assets} ({np.count_nonzero(available_for_fcr)/n_assets*100:.1f}%)")
+    print(f"  Actifs avec SOC suffisant : {np.count_nonzero(has_enough_soc)} / {n_assets} ({np.count_nonzero(has_enough_soc)/n_assets*100:.1f}%)")
+    print(f"  Actifs pouvant fournir FCR : {np.count_nonzero(can_provide_fcr)} / {n_assets} ({np.count_nonzero(can_provide_fcr)/n_assets*100:.1f}%)")
     
-    available_fcr_power = np.sum(powers[can_provide_fcr])
+    available_fcr_power = np.einsum('i,i->', powers, can_provide_fcr, dtype=np.float64)
     print(f"\nPuissance FCR :")
     print(f"  Puissance disponible : {available_fcr_power/1000:.2f} MW")
     print(f"  Puissance requise : {REQUIRED_POWER/1000:.1f} MW")
     print(f"  Statut : {'SUCCÈS' if available_fcr_power >= REQUIRED_POWER else 'ÉCHEC'}")
 
 
-def analyze_one_year(n_assets):
+def analyze_one_year(n_assets, seed=None):
     """
     Rapport complet d'analyse pour un portefeuille de taille donnée.
     
     Génère toutes les visualisations et statistiques nécessaires pour évaluer
-    la performance d'une configuration.
+    la performance d'une configuration. seed rend l'année simulée reproductible.
     """
     print(f"\n{'='*70}")
     print(f"ANALYSE D'UNE ANNÉE AVEC {n_assets} ACTIFS")
@@ -471,11 +774,12 @@ def analyze_one_year(n_assets):
     print(f"  Balance nette attendue : {expected_balance:+.3f}% par slot")
     print(f"  Balance annuelle (2190 slots) : {expected_balance * N_SLOTS_YEAR:+.1f}%\n")
     
-    result = simulate_year_with_tracking(n_assets)
+    rng = np.random.default_rng(seed)
+    result = simulate_year_with_tracking(n_assets, seed=rng.spawn(1)[0])
     
     print(f"Résultats :")
     print(f"  Taux de disponibilité annuel : {result['success_rate']*100:.2f}%")
-    print(f"  Slots réussis : {np.sum(result['success_history'])} / {N_SLOTS_YEAR}")
+    print(f"  Slots réussis : {np.count_nonzero(result['success_history'])} / {N_SLOTS_YEAR}")
     print(f"  Capacité installée : {installed_capacity(n_assets)/1000:.1f} MW")
     print(f"  Surdimensionnement : x{installed_capacity(n_assets)/REQUIRED_POWER:.2f}")
     print(f"  Surdimensionnement théorique (1/p) : x{1.0/P_AVAILABLE_FCR:.2f}")
@@ -515,47 +819,78 @@ def find_min_assets_annual(
     confidence_target=0.95,
     n_min=100,
     n_max=400,
-    step=10
+    step=10,
+    max_trials=100,
+    seed=None
 ):
     """
     Recherche dichotomique du nombre minimal d'actifs pour atteindre l'objectif.
     
+    La probabilité de succès croît avec le nombre d'actifs : on bissecte donc
+    sur la grille n_min, n_min + step, ..., n_max, ce qui demande environ
+    log2 du nombre de points évalués au lieu d'un balayage complet.
+    
     Args:
         confidence_target: Taux de disponibilité annuel cible (ex: 0.95 pour 95%)
         n_min: Borne inférieure de la recherche
         n_max: Borne supérieure de la recherche
         step: Pas de la recherche
+        max_trials: Nombre maximal de simulations par taille évaluée
+        seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
         
     Returns:
         Tuple (n_assets, capacity, oversizing, probability) ou None si non trouvé
     """
     print(f"\nRecherche du nombre minimal d'actifs (cible : {confidence_target*100:.0f}%)\n")
     
+    # Un flux aléatoire fils pour le diagnostic et pour chaque taille évaluée
+    rng = np.random.default_rng(seed)
+    
     # Diagnostic initial pour validation
-    diagnostic_slot(n_min)
-    
-    for n_assets in range(n_min, n_max + 1, step):
-        prob = annual_success_probability(n_assets, n_trials=100)
-        capacity = installed_capacity(n_assets)
-        oversizing = capacity / REQUIRED_POWER
-
-        print(
-            f"{n_assets:3d} actifs | "
-            f"Capacité {capacity/1000:5.1f} MW | "
-            f"Surdim x{oversizing:.2f} | "
-            f"P = {prob:.3f}"
-        )
-
-        if prob >= confidence_target:
-            print(f"\n{'='*70}")
-            print("SEUIL ATTEINT")
-            print(f"{'='*70}")
-            print(f"  Nombre minimal d'actifs : {n_assets}")
-            print(f"  Capacité installée : {capacity/1000:.1f} MW")
-            print(f"  Facteur de surdimensionnement : x{oversizing:.2f}")
-            print(f"  Probabilité de succès annuel : {prob:.1%}")
-            print(f"  Surdimensionnement théorique (1/p) : x{1.0/P_AVAILABLE_FCR:.2f}")
-            return n_assets, capacity, oversizing, prob
+    diagnostic_slot(n_min, seed=rng.spawn(1)[0])
+    
+    grid = range(n_min, n_max + 1, step)
+    
+    # Invariant : grid[lo] échoue et grid[hi] réussit (indices hors grille = sentinelles)
+    lo, hi = -1, len(grid)
+    best = None
+    
+    # Un seul pool de processus pour toute la recherche
+    with trial_executor() as executor:
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            n_assets = grid[mid]
+            prob, n_trials, reached = annual_success_probability_adaptive(
+                n_assets, confidence_target, max_trials=max_trials,
+                seed=rng.spawn(1)[0], executor=executor
+            )
+            capacity = installed_capacity(n_assets)
+            oversizing = capacity / REQUIRED_POWER
+
+            print(
+                f"{n_assets:3d} actifs | "
+                f"Capacité {capacity/1000:5.1f} MW | "
+                f"Surdim x{oversizing:.2f} | "
+                f"P = {prob:.3f} ({n_trials} essais)"
+            )
+
+            if reached:
+                hi = mid
+                best = n_assets, capacity, oversizing, prob
+            else:
+                lo = mid
+
+    if best is not None:
+        n_assets, capacity, oversizing, prob = best
+        print(f"\n{'='*70}")
+        print("SEUIL ATTEINT")
+        print(f"{'='*70}")
+        print(f"  Nombre minimal d'actifs : {n_assets}")
+        print(f"  Capacité installée : {capacity/1000:.1f} MW")
+        print(f"  Facteur de surdimensionnement : x{oversizing:.2f}")
+        print(f"  Probabilité de succès annuel : {prob:.1%}")
+        print(f"  Surdimensionnement théorique (1/p) : x{1.0/P_AVAILABLE_FCR:.2f}")
+        return best
 
     print("\nSeuil non atteint dans la plage explorée")
     print(f"Augmentez n_max au-delà de {n_max} ou ajustez les paramètres du modèle")
@@ -0,0 +1,94 @@
+import numpy as np
+from numba import njit, prange
+
+# =====================================================
+# NOYAU COMPILÉ (NUMBA) DE LA SIMULATION ANNUELLE
+# =====================================================
+# Les paramètres du modèle sont passés explicitement en arguments : ce module
+# ne dépend pas de vpp6.py, qui reste la seule source des constantes.
+#
+# Toutes les fonctions compilées sont regroupées ici et mises en cache
+# (cache=True) : la compilation n'a lieu qu'au premier lancement, les
+# exécutions suivantes rechargent le code machine depuis __pycache__.
+
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def simulate_year_nb(n_assets, soc_mean, soc_std, power_mean, power_std,
+                     p_avail, discharge_delta, recharge_delta, energy_hours,
+                     required_power, n_slots, min_success_rate, seed):
+    """
+    Équivalent compilé de simulate_year : une année complète, actif par actif.
+
+    simulate_slot_and_update devient une seule boucle sur les actifs avec des
+    accumulateurs scalaires : chaque SOC est lu et écrit une fois par slot,
+    sans tableau temporaire ni coût d'appel NumPy.
+
+    Args:
+        n_assets: Nombre d'actifs dans le portefeuille
+        soc_mean, soc_std: Paramètres du SOC initial (kWh)
+        power_mean, power_std: Paramètres de la puissance nominale (kW)
+        p_avail: Probabilité de disponibilité FCR
+        discharge_delta, recharge_delta: Variations de SOC par slot (kWh) si
+            l'actif fournit la FCR / s'il est sur un autre marché
+        energy_hours: Durée d'un slot (heures)
+        required_power: Puissance FCR requise (kW)
+        n_slots: Nombre de slots simulés
+        min_success_rate: Taux de succès annuel exigé
+        seed: Graine du générateur Numba (ignorée si négative)
+
+    Returns:
+        True si l'année respecte min_success_rate
+    """
+    if seed >= 0:
+        np.random.seed(seed)
+
+    socs = np.empty(n_assets)
+    for i in range(n_assets):
+        socs[i] = max(0.0, np.random.normal(soc_mean, soc_std))
+
+    success_count = 0
+
+    for _ in range(n_slots):
+        total = 0.0
+        for i in range(n_assets):
+            p = max(20.0, np.random.normal(power_mean, power_std))
+            avail = np.random.random() < p_avail
+            ok = avail and socs[i] >= p * energy_hours
+            if ok:
+                total += p
+                socs[i] += discharge_delta
+            else:
+                socs[i] += recharge_delta
+            if socs[i] < 0.0:
+                socs[i] = 0.0
+
+        if total >= required_power:
+            success_count += 1
+
+    return success_count / n_slots >= min_success_rate
+
+
+@njit(parallel=True, cache=True, fastmath=True, error_model='numpy')
+def count_successful_years_nb(n_assets, n_trials, soc_mean, soc_std,
+                              power_mean, power_std, p_avail,
+                              discharge_delta, recharge_delta,
+                              energy_hours, required_power, n_slots,
+                              min_success_rate, seed):
+    """
+    Équivalent compilé de count_successful_years, essais répartis sur les cœurs.
+
+    Les essais sont indépendants : prange les distribue entre threads sans
+    GIL. L'essai t utilise la graine seed + t, ce qui donne à chacun un flux
+    aléatoire distinct et rend le résultat reproductible.
+
+    Returns:
+        Nombre des n_trials années ayant atteint min_success_rate
+    """
+    successes = 0
+    for t in prange(n_trials):
+        successes += int(simulate_year_nb(
+            n_assets, soc_mean, soc_std, power_mean, power_std, p_avail,
+            discharge_delta, recharge_delta, energy_hours, required_power, n_slots,
+            min_success_rate, seed + t
+        ))
+    return successes